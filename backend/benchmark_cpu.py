@@ -0,0 +1,144 @@
+"""Benchmark the CPU execution profile against the float32 baseline.
+
+This script runs a locally stored ControlNet pipeline in three configurations
+on the same control image and seeds:
+
+- fp32: the float32 baseline with its original scheduler and step count
+- fp32-fast: float32 with the CPU profile's scheduler and step count
+- cpu: the CPU profile (int8 quantised UNet/ControlNet, fast scheduler)
+
+It reports the latency of each, the similarity of cpu to fp32-fast (the
+quantisation error alone) and of cpu to fp32 (the end-to-end change).
+
+A small random-weight model keeps the benchmark fast and runs offline:
+    python export_cpu_model.py --tiny --output models/tiny
+    python benchmark_cpu.py --model-dir models/tiny --resolution 128 \
+        --image ../frontend/example_images/mri_brain.jpg
+"""
+
+import argparse
+import statistics
+import time
+import cv2
+import numpy as np
+import torch
+from PIL import Image
+from diffusers import StableDiffusionControlNetPipeline
+
+from cpu_profile import configure_threads, load_cpu_pipeline, use_fast_scheduler
+
+
+def run(pipe, control_image, prompt, steps, seeds):
+    """Generate one image per seed and record the latency of each run.
+
+    Returns:
+        Tuple[List[float], List[np.ndarray]]: Latencies in seconds and images
+    """
+    latencies, images = [], []
+    for seed in seeds:
+        generator = torch.Generator(device="cpu").manual_seed(seed)
+        start = time.perf_counter()
+        with torch.no_grad():
+            result = pipe(
+                prompt=prompt,
+                image=control_image,
+                num_inference_steps=steps,
+                generator=generator,
+                return_dict=False,
+            )
+        latencies.append(time.perf_counter() - start)
+        images.append(np.asarray(result[0][0], dtype=np.float32))
+    return latencies, images
+
+
+def psnr(reference: np.ndarray, candidate: np.ndarray) -> float:
+    """Peak signal-to-noise ratio between two uint8-range images in dB."""
+    mse = np.mean((reference - candidate) ** 2)
+    if mse == 0:
+        return float("inf")
+    return 10 * np.log10(255.0**2 / mse)
+
+
+def cosine_similarity(reference: np.ndarray, candidate: np.ndarray) -> float:
+    """Cosine similarity between two mean-centred images."""
+    a = (reference - reference.mean()).ravel()
+    b = (candidate - candidate.mean()).ravel()
+    return float(np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b) + 1e-8))
+
+
+def summarize(name, latencies):
+    print(
+        f"{name:<10} mean {statistics.mean(latencies):7.3f}s  "
+        f"median {statistics.median(latencies):7.3f}s"
+    )
+
+
+def compare(name, seeds, references, candidates):
+    print(name)
+    for seed, reference, candidate in zip(seeds, references, candidates):
+        print(
+            f"  seed {seed}: PSNR {psnr(reference, candidate):6.2f} dB  "
+            f"cosine {cosine_similarity(reference, candidate):.4f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--model-dir", required=True)
+    parser.add_argument("--image", required=True)
+    parser.add_argument("--prompt", default="mri brain scan, good quality")
+    parser.add_argument("--resolution", type=int, default=512)
+    parser.add_argument("--baseline-steps", type=int, default=20)
+    parser.add_argument("--profile-steps", type=int, default=10)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--threads", type=int, default=0)
+    parser.add_argument("--no-quantize", action="store_true")
+    args = parser.parse_args()
+
+    image = Image.open(args.image).convert("L")
+    image = image.resize((args.resolution, args.resolution))
+    canny = cv2.Canny(np.array(image), 100, 200)
+    control_image = Image.fromarray(np.stack([canny] * 3, axis=2))
+    seeds = list(range(args.runs))
+
+    configure_threads(args.threads)
+    baseline = StableDiffusionControlNetPipeline.from_pretrained(
+        args.model_dir,
+        torch_dtype=torch.float32,
+        safety_checker=None,
+        requires_safety_checker=False,
+        local_files_only=True,
+    ).to("cpu")
+    baseline.set_progress_bar_config(disable=True)
+    baseline_latencies, baseline_images = run(
+        baseline, control_image, args.prompt, args.baseline_steps, seeds
+    )
+
+    # Same scheduler and step count as the profile, so that comparing against
+    # this run isolates the quantisation error.
+    baseline = use_fast_scheduler(baseline)
+    fast_latencies, fast_images = run(
+        baseline, control_image, args.prompt, args.profile_steps, seeds
+    )
+    del baseline
+
+    profile = load_cpu_pipeline(
+        model_dir=args.model_dir,
+        quantize=not args.no_quantize,
+        num_threads=args.threads,
+    )
+    profile.set_progress_bar_config(disable=True)
+    profile_latencies, profile_images = run(
+        profile, control_image, args.prompt, args.profile_steps, seeds
+    )
+
+    summarize("fp32", baseline_latencies)
+    summarize("fp32-fast", fast_latencies)
+    summarize("cpu", profile_latencies)
+    speedup = statistics.mean(baseline_latencies) / statistics.mean(profile_latencies)
+    print(f"speedup    {speedup:.2f}x vs fp32")
+    speedup = statistics.mean(fast_latencies) / statistics.mean(profile_latencies)
+    print(f"speedup    {speedup:.2f}x vs fp32-fast")
+
+    compare("quantisation (cpu vs fp32-fast):", seeds, fast_images, profile_images)
+    compare("end to end (cpu vs fp32):", seeds, baseline_images, profile_images)
@@ -7,6 +7,7 @@ Settings are loaded from environment variables or .env file.
 from pydantic_settings import BaseSettings
 from pydantic import ConfigDict
 from functools import lru_cache
+from typing import Literal, Optional
 
 
 class Settings(BaseSettings):
@@ -24,6 +25,25 @@ class Settings(BaseSettings):
         LOG_LEVEL (str): Logging verbosity level
         API_PREFIX (str): Prefix for all API endpoints
         MAX_FILE_SIZE_MB (int): Maximum allowed upload file size in MB
+        MAX_SWEEP_CELLS (int): Maximum number of grid cells in a single sweep request
+        MAX_SWEEP_BATCH_SIZE (int): Maximum number of images per sweep diffusion run
+        EXECUTION_PROFILE (str): Pipeline profile, 'gpu' (fp16) or 'cpu' (int8)
+        CPU_MODEL_DIR (Optional[str]): Local directory with the pipeline for the
+            CPU profile, falls back to the default models if unset
+        CPU_QUANTIZE (bool): Quantise UNet/ControlNet linear layers in the CPU profile
+        CPU_NUM_THREADS (int): CPU threads for inference, 0 for one per core
+        CPU_MAX_INFERENCE_STEPS (int): Upper bound on denoising steps in the CPU profile
+        MEMORY_GOVERNOR_ENABLED (bool): Whether to apply memory-aware admission control
+        MEMORY_BUDGET_MB (int): Memory budget for the execution device in MB,
+            0 for 90% of its total memory
+        MEMORY_MB_PER_MEGAPIXEL (int): Estimated peak memory per generated megapixel
+        MEMORY_MB_PER_OUTPUT_MEGAPIXEL (int): Estimated memory per output megapixel
+            for the full-size buffers of tiled generation
+        MEMORY_OVERHEAD_MB (int): Estimated fixed peak memory per request
+        MEMORY_QUEUE_TIMEOUT_S (float): Maximum time a request waits for memory
+        MEMORY_DEGRADE_RESOLUTION (bool): Lower the resolution under memory pressure
+        MEMORY_DEGRADE_AFTER_S (float): Waiting time before degrading the resolution
+        MEMORY_MIN_RESOLUTION (int): Lowest resolution to degrade to
     """
 
     APP_TITLE: str
@@ -37,6 +57,22 @@ class Settings(BaseSettings):
     LOG_LEVEL: str
     API_PREFIX: str = "/api/v1"
     MAX_FILE_SIZE_MB: int = 10
+    MAX_SWEEP_CELLS: int = 64
+    MAX_SWEEP_BATCH_SIZE: int = 8
+    EXECUTION_PROFILE: Literal["gpu", "cpu"] = "gpu"
+    CPU_MODEL_DIR: Optional[str] = None
+    CPU_QUANTIZE: bool = True
+    CPU_NUM_THREADS: int = 0
+    CPU_MAX_INFERENCE_STEPS: int = 10
+    MEMORY_GOVERNOR_ENABLED: bool = True
+    MEMORY_BUDGET_MB: int = 0
+    MEMORY_MB_PER_MEGAPIXEL: int = 3072
+    MEMORY_MB_PER_OUTPUT_MEGAPIXEL: int = 64
+    MEMORY_OVERHEAD_MB: int = 512
+    MEMORY_QUEUE_TIMEOUT_S: float = 60.0
+    MEMORY_DEGRADE_RESOLUTION: bool = False
+    MEMORY_DEGRADE_AFTER_S: float = 10.0
+    MEMORY_MIN_RESOLUTION: int = 256
 
     model_config = ConfigDict(
         env_file=".env",
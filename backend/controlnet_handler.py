@@ -8,11 +8,14 @@ import numpy as np
 import cv2
 from PIL import Image
 import torch
+import itertools
 import logging
+from typing import List
 
 from config.settings import get_settings
 from data_models.processing_request import ProcessingRequest
 from pipeline_manager import PipelineManager
+from tiling import blend_weights, compute_output_size, iter_tiles
 
 
 logger = logging.getLogger(__name__)
@@ -51,6 +54,29 @@ class ControlNetHandler:
         canny_image = np.stack([canny] * 3, axis=2)
         return Image.fromarray(canny_image)
 
+    def get_output_size(self, input_image, params: ProcessingRequest):
+        """Compute the output size for the given input image and parameters.
+
+        Tiled generation preserves the aspect ratio of the input, using
+        ``image_resolution`` as the longest side. Otherwise the output is a
+        square of ``image_resolution`` pixels.
+
+        Args:
+            input_image (Union[np.ndarray, PIL.Image]): Input image to process
+            params (ProcessingRequest): Processing parameters
+
+        Returns:
+            Tuple[int, int]: Output (width, height)
+        """
+        if not params.tiled:
+            return params.image_resolution, params.image_resolution
+
+        if isinstance(input_image, np.ndarray):
+            height, width = input_image.shape[:2]
+        else:
+            width, height = input_image.size
+        return compute_output_size(width, height, params.image_resolution)
+
     def process_with_controlnet(self, input_image, params: ProcessingRequest):
         """Process an image using ControlNet-guided Stable Diffusion.
 
@@ -62,36 +88,265 @@ class ControlNetHandler:
             PIL.Image: Generated image guided by ControlNet
         """
 
-        pipeline = self.pipeline_manager.get_pipeline()
-
         if isinstance(input_image, np.ndarray):
             input_image = Image.fromarray(input_image)
 
-        input_image = input_image.resize(
-            (params.image_resolution, params.image_resolution)
+        input_image = input_image.resize(self.get_output_size(input_image, params))
+
+        if params.tiled:
+            return self.process_tiled(input_image, params)
+
+        control_image = self.apply_canny(
+            np.array(input_image), params.low_threshold, params.high_threshold
+        )
+
+        generated_image = self._generate(
+            control_image, params, self._make_generator(params)
         )
 
+        return control_image, generated_image
+
+    def process_tiled(self, input_image: Image.Image, params: ProcessingRequest):
+        """Process a resized image tile by tile, blending tiles in latent space.
+
+        The image is split into overlapping tiles of ``params.tile_size``
+        pixels, each with its own Canny control image. A single latent canvas
+        covers the whole image; at every denoising step the UNet and ControlNet
+        predict noise for each tile, and the predictions are feather-blended
+        into one scheduler step for the full canvas (MultiDiffusion). Tiles
+        therefore share the same noise and stay consistent across seams. The
+        prompt is encoded once, and the VAE decodes in tiles, so peak model
+        memory depends on the tile size rather than the image size.
+
+        Args:
+            input_image (PIL.Image): Input image already resized to the output size
+            params (ProcessingRequest): Processing parameters
+
+        Returns:
+            Tuple[PIL.Image, PIL.Image]: Control image and generated image
+        """
+        pipeline = self.pipeline_manager.get_pipeline()
+        width, height = input_image.size
+        input_array = np.array(input_image)
+        generator = self._make_generator(params)
+        do_guidance = params.guidance_scale > 1
+
+        control_canvas = np.zeros((height, width, 3), dtype=np.uint8)
+        tiles = iter_tiles(width, height, params.tile_size, params.tile_overlap)
+        control_tiles = []
+        for left, top, right, bottom in tiles:
+            control_tile = self.apply_canny(
+                input_array[top:bottom, left:right],
+                params.low_threshold,
+                params.high_threshold,
+            )
+            control_canvas[top:bottom, left:right] = np.array(control_tile)
+            control_tiles.append(control_tile)
+
+        with self.pipeline_manager.lock, torch.no_grad():
+            device = pipeline._execution_device
+            prompt_embeds, negative_prompt_embeds = pipeline.encode_prompt(
+                params.prompt,
+                device,
+                1,
+                do_guidance,
+                negative_prompt=params.negative_prompt,
+            )
+            if do_guidance:
+                prompt_embeds = torch.cat([negative_prompt_embeds, prompt_embeds])
+
+            # Control tensors stay on the CPU and are moved to the device one
+            # tile at a time, so device memory does not grow with the image.
+            control_tensors = [
+                pipeline.prepare_image(
+                    image=control_tile,
+                    width=control_tile.width,
+                    height=control_tile.height,
+                    batch_size=1,
+                    num_images_per_prompt=1,
+                    device="cpu",
+                    dtype=pipeline.controlnet.dtype,
+                )
+                for control_tile in control_tiles
+            ]
+
+            pipeline.scheduler.set_timesteps(
+                self.pipeline_manager.get_inference_steps(params.num_inference_steps),
+                device=device,
+            )
+            latents = pipeline.prepare_latents(
+                1,
+                pipeline.unet.config.in_channels,
+                height,
+                width,
+                prompt_embeds.dtype,
+                device,
+                generator,
+            )
+            scale = pipeline.vae_scale_factor
+            weights = [
+                torch.from_numpy(
+                    blend_weights(
+                        (right - left) // scale,
+                        (bottom - top) // scale,
+                        params.tile_overlap // scale,
+                    )[:, :, 0]
+                ).to(device=device, dtype=latents.dtype)
+                for left, top, right, bottom in tiles
+            ]
+
+            for step, t in enumerate(pipeline.scheduler.timesteps):
+                logger.debug(f"Tiled denoising step {step + 1}")
+                noise_pred = torch.zeros_like(latents)
+                weight_sum = torch.zeros_like(latents[:, :1])
+
+                for box, control, weight in zip(tiles, control_tensors, weights):
+                    left, top, right, bottom = (value // scale for value in box)
+                    view = latents[:, :, top:bottom, left:right]
+                    model_input = torch.cat([view] * 2) if do_guidance else view
+                    model_input = pipeline.scheduler.scale_model_input(model_input, t)
+                    control = control.to(device)
+                    if do_guidance:
+                        control = torch.cat([control] * 2)
+
+                    down_residuals, mid_residual = pipeline.controlnet(
+                        model_input,
+                        t,
+                        encoder_hidden_states=prompt_embeds,
+                        controlnet_cond=control,
+                        conditioning_scale=params.controlnet_conditioning_scale,
+                        return_dict=False,
+                    )
+                    view_pred = pipeline.unet(
+                        model_input,
+                        t,
+                        encoder_hidden_states=prompt_embeds,
+                        down_block_additional_residuals=down_residuals,
+                        mid_block_additional_residual=mid_residual,
+                        return_dict=False,
+                    )[0]
+                    if do_guidance:
+                        uncond_pred, text_pred = view_pred.chunk(2)
+                        view_pred = uncond_pred + params.guidance_scale * (
+                            text_pred - uncond_pred
+                        )
+
+                    noise_pred[:, :, top:bottom, left:right] += view_pred * weight
+                    weight_sum[:, :, top:bottom, left:right] += weight
+
+                latents = pipeline.scheduler.step(
+                    noise_pred / weight_sum, t, latents, return_dict=False
+                )[0]
+
+            pipeline.vae.enable_tiling()
+            try:
+                image = pipeline.vae.decode(
+                    latents / pipeline.vae.config.scaling_factor, return_dict=False
+                )[0]
+            finally:
+                pipeline.vae.disable_tiling()
+            pipeline.maybe_free_model_hooks()
+
+        generated_image = pipeline.image_processor.postprocess(
+            image, output_type="pil"
+        )[0]
+        return Image.fromarray(control_canvas), generated_image
+
+    def process_sweep(
+        self, input_image, cells: List[ProcessingRequest], batch_size: int
+    ):
+        """Generate images for a grid of parameter cells sharing one input.
+
+        Resizing, edge detection and prompt encoding run once for the whole
+        grid. Cells sharing the same guidance and conditioning scales are
+        batched into a single diffusion run of up to ``batch_size`` images.
+
+        Args:
+            input_image (Union[np.ndarray, PIL.Image]): Input image to process
+            cells (List[ProcessingRequest]): Parameters for every grid cell,
+                differing only in seed and scales
+            batch_size (int): Maximum number of images per diffusion run
+
+        Yields:
+            Tuple[ProcessingRequest, PIL.Image, PIL.Image]: Cell parameters,
+                control image and generated image for every cell
+        """
+        params = cells[0]
+        pipeline = self.pipeline_manager.get_pipeline()
+
+        if isinstance(input_image, np.ndarray):
+            input_image = Image.fromarray(input_image)
+
+        input_image = input_image.resize(self.get_output_size(input_image, params))
         control_image = self.apply_canny(
             np.array(input_image), params.low_threshold, params.high_threshold
         )
 
-        generator = None
-        if params.seed is not None:
-            generator = torch.Generator(device=self.settings.DEVICE).manual_seed(
-                params.seed
+        with self.pipeline_manager.lock, torch.no_grad():
+            prompt_embeds, negative_prompt_embeds = pipeline.encode_prompt(
+                params.prompt,
+                pipeline._execution_device,
+                1,
+                True,
+                negative_prompt=params.negative_prompt,
             )
 
-        result = pipeline(
-            prompt=params.prompt,
-            image=control_image,
-            negative_prompt=params.negative_prompt,
-            num_inference_steps=params.num_inference_steps,
-            guidance_scale=params.guidance_scale,
-            controlnet_conditioning_scale=params.controlnet_conditioning_scale,
-            generator=generator,
-            return_dict=False,
+        for batch in self._sweep_batches(cells, batch_size):
+            scales = batch[0]
+            with self.pipeline_manager.lock:
+                result = pipeline(
+                    prompt_embeds=prompt_embeds.repeat(len(batch), 1, 1),
+                    negative_prompt_embeds=negative_prompt_embeds.repeat(
+                        len(batch), 1, 1
+                    ),
+                    image=control_image,
+                    num_inference_steps=self.pipeline_manager.get_inference_steps(
+                        params.num_inference_steps
+                    ),
+                    guidance_scale=scales.guidance_scale,
+                    controlnet_conditioning_scale=scales.controlnet_conditioning_scale,
+                    height=control_image.height,
+                    width=control_image.width,
+                    generator=[self._make_generator(cell) for cell in batch],
+                    return_dict=False,
+                )
+
+            for cell, generated_image in zip(batch, result[0]):
+                yield cell, control_image, generated_image
+
+    def _sweep_batches(self, cells: List[ProcessingRequest], batch_size: int):
+        def scales(cell):
+            return cell.guidance_scale, cell.controlnet_conditioning_scale
+
+        for _, group in itertools.groupby(cells, key=scales):
+            group = list(group)
+            for start in range(0, len(group), batch_size):
+                yield group[start : start + batch_size]
+
+    def _make_generator(self, params: ProcessingRequest):
+        if params.seed is None:
+            return None
+        return torch.Generator(device=self.pipeline_manager.device).manual_seed(
+            params.seed
         )
 
-        generated_image = result[0][0] if isinstance(result[0], list) else result[0]
+    def _generate(self, control_image, params: ProcessingRequest, generator):
+        pipeline = self.pipeline_manager.get_pipeline()
 
-        return control_image, generated_image
+        with self.pipeline_manager.lock:
+            result = pipeline(
+                prompt=params.prompt,
+                image=control_image,
+                negative_prompt=params.negative_prompt,
+                num_inference_steps=self.pipeline_manager.get_inference_steps(
+                    params.num_inference_steps
+                ),
+                guidance_scale=params.guidance_scale,
+                controlnet_conditioning_scale=params.controlnet_conditioning_scale,
+                height=control_image.height,
+                width=control_image.width,
+                generator=generator,
+                return_dict=False,
+            )
+
+        return result[0][0] if isinstance(result[0], list) else result[0]
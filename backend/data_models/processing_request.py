@@ -2,9 +2,14 @@
 
 This module defines the data structure for image processing parameters used in the MRI ControlNet pipeline.
 """
-from pydantic import BaseModel
+from pydantic import BaseModel, model_validator
 from typing import Optional
 
+# Bounds for tiled generation. With the smallest tile and the largest overlap,
+# a MAX_TILED_RESOLUTION square is covered by at most 32 x 32 tiles.
+MIN_TILE_SIZE = 256
+MAX_TILED_RESOLUTION = 4096
+
 
 class ProcessingRequest(BaseModel):
     """Configuration parameters for image processing using ControlNet and Stable Diffusion.
@@ -21,6 +26,15 @@ class ProcessingRequest(BaseModel):
         image_resolution (int): Output image size in pixels (default: 512)
         color_transfer_mode (str): Color transfer algorithm to use (default: "lab")
         color_transfer_strength (float): Intensity of color transfer (default: 1.0)
+        tiled (bool): Generate the image tile by tile, preserving the input aspect
+            ratio with image_resolution as the longest side. Tiles are denoised
+            jointly and blended in latent space at every step (default: False)
+            image_resolution is limited to MAX_TILED_RESOLUTION in this mode.
+        tile_size (int): Tile side length in pixels for tiled generation, a multiple
+            of 64 no smaller than MIN_TILE_SIZE (default: 512)
+        tile_overlap (int): Overlap between neighbouring tiles in pixels, a multiple
+            of 8 up to half the tile size; larger overlaps give smoother seams at
+            extra cost (default: 64)
     """
 
     prompt: str
@@ -34,3 +48,23 @@ class ProcessingRequest(BaseModel):
     image_resolution: int = 512
     color_transfer_mode: str = "lab"  # "lab", "yuv", or "luminance"
     color_transfer_strength: float = 1.0
+    tiled: bool = False
+    tile_size: int = 512
+    tile_overlap: int = 64
+
+    @model_validator(mode="after")
+    def check_tiling(self):
+        if self.tile_size < MIN_TILE_SIZE or self.tile_size % 64 != 0:
+            raise ValueError(
+                f"tile_size must be a multiple of 64 of at least {MIN_TILE_SIZE}"
+            )
+        if not 0 <= self.tile_overlap <= self.tile_size // 2 or self.tile_overlap % 8:
+            raise ValueError(
+                "tile_overlap must be a multiple of 8 in [0, tile_size / 2]"
+            )
+        if self.tiled and self.image_resolution > MAX_TILED_RESOLUTION:
+            raise ValueError(
+                f"image_resolution must be at most {MAX_TILED_RESOLUTION} "
+                "for tiled generation"
+            )
+        return self
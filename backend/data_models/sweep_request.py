@@ -0,0 +1,89 @@
+"""Data model for parameter sweep requests.
+
+This module defines the parameter grid used to generate several variants of one
+input image in a single call to the MRI ControlNet pipeline.
+"""
+import itertools
+import random
+from pydantic import model_validator
+from typing import List, Literal
+
+from data_models.processing_request import ProcessingRequest
+
+
+class SweepRequest(ProcessingRequest):
+    """Parameter grid for generating multiple variants of a single image.
+
+    Inherits all fields of ProcessingRequest as the base parameters. Each list
+    below overrides the matching base field; an empty list keeps the base value.
+
+    Attributes:
+        seeds (List[int]): Seeds to sweep over (default: base seed)
+        guidance_scales (List[float]): Guidance scales to sweep over
+        controlnet_conditioning_scales (List[float]): ControlNet conditioning
+            scales to sweep over
+        batch_size (int): Maximum number of images per diffusion run, capped by
+            MAX_SWEEP_BATCH_SIZE (default: 4)
+        output (str): Response format, "contact_sheet" for a single PNG grid or
+            "cells" for streamed per-cell results (default: "contact_sheet")
+    """
+
+    seeds: List[int] = []
+    guidance_scales: List[float] = []
+    controlnet_conditioning_scales: List[float] = []
+    batch_size: int = 4
+    output: Literal["contact_sheet", "cells"] = "contact_sheet"
+
+    @model_validator(mode="after")
+    def check_sweep(self):
+        if self.tiled:
+            raise ValueError("tiled generation is not supported for sweeps")
+        if self.batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        return self
+
+    def num_cells(self) -> int:
+        """Return the number of grid cells without expanding the grid."""
+        return (
+            max(len(self.seeds), 1)
+            * max(len(self.guidance_scales), 1)
+            * max(len(self.controlnet_conditioning_scales), 1)
+        )
+
+    def cells(self) -> List[ProcessingRequest]:
+        """Expand the grid into one ProcessingRequest per cell.
+
+        Cells are ordered by guidance scale, then conditioning scale, then seed,
+        so cells sharing the same scales are adjacent. A random seed is drawn
+        when neither ``seeds`` nor ``seed`` is set, so every cell is reproducible.
+
+        Returns:
+            List[ProcessingRequest]: Processing parameters for every grid cell
+        """
+        seeds = self.seeds or [
+            self.seed if self.seed is not None else random.randrange(2**32)
+        ]
+        guidance_scales = self.guidance_scales or [self.guidance_scale]
+        conditioning_scales = self.controlnet_conditioning_scales or [
+            self.controlnet_conditioning_scale
+        ]
+
+        base = ProcessingRequest(
+            **self.model_dump(include=set(ProcessingRequest.model_fields))
+        )
+        return [
+            base.model_copy(
+                update={
+                    "seed": seed,
+                    "guidance_scale": guidance_scale,
+                    "controlnet_conditioning_scale": conditioning_scale,
+                }
+            )
+            for guidance_scale, conditioning_scale, seed in itertools.product(
+                guidance_scales, conditioning_scales, seeds
+            )
+        ]
+
+    def columns(self) -> int:
+        """Return the number of cells per contact sheet row (one per seed)."""
+        return max(len(self.seeds), 1)
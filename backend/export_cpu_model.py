@@ -0,0 +1,155 @@
+"""Export a ControlNet pipeline to a local directory for the CPU profile.
+
+This script loads the Stable Diffusion and ControlNet models in float32 and
+saves them as a single pipeline directory that CPU-only nodes can load without
+network access by setting CPU_MODEL_DIR. The models default to
+DEFAULT_SD_MODEL and DEFAULT_CONTROLNET_MODEL from the settings.
+
+With --tiny, a small pipeline with random weights is built locally instead,
+without any download. It is meant for benchmark_cpu.py and smoke tests only.
+
+Example:
+    python export_cpu_model.py --output models/cpu
+    python export_cpu_model.py --tiny --output models/tiny
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import torch
+from diffusers import (
+    StableDiffusionControlNetPipeline,
+    ControlNetModel,
+    UNet2DConditionModel,
+    AutoencoderKL,
+    DDIMScheduler,
+)
+from transformers import CLIPTextConfig, CLIPTextModel, CLIPTokenizer
+from transformers.models.clip.tokenization_clip import bytes_to_unicode
+
+from config.settings import get_settings
+
+
+def export(sd_model: str, controlnet_model: str, output: str):
+    """Save a float32 ControlNet pipeline to a local directory.
+
+    Args:
+        sd_model (str): Path or name of the Stable Diffusion model
+        controlnet_model (str): Path or name of the ControlNet model
+        output (str): Directory to write the pipeline to
+    """
+    controlnet = ControlNetModel.from_pretrained(
+        controlnet_model, torch_dtype=torch.float32
+    )
+    pipe = StableDiffusionControlNetPipeline.from_pretrained(
+        sd_model,
+        controlnet=controlnet,
+        torch_dtype=torch.float32,
+        safety_checker=None,
+        requires_safety_checker=False,
+    )
+    pipe.save_pretrained(output)
+
+
+def build_tiny_tokenizer() -> CLIPTokenizer:
+    """Build a character-level CLIP tokenizer without downloading a vocabulary."""
+    characters = list(bytes_to_unicode().values())
+    tokens = characters + [c + "</w>" for c in characters]
+    tokens += ["<|startoftext|>", "<|endoftext|>"]
+
+    with tempfile.TemporaryDirectory() as directory:
+        vocab_file = os.path.join(directory, "vocab.json")
+        merges_file = os.path.join(directory, "merges.txt")
+        with open(vocab_file, "w", encoding="utf-8") as f:
+            json.dump({token: index for index, token in enumerate(tokens)}, f)
+        with open(merges_file, "w", encoding="utf-8") as f:
+            f.write("#version: 0.2\n")
+        return CLIPTokenizer(vocab_file, merges_file, model_max_length=77)
+
+
+def export_tiny(output: str, seed: int = 0):
+    """Save a small random-weight ControlNet pipeline to a local directory.
+
+    The architecture mirrors Stable Diffusion 1.5 at a fraction of its width
+    and depth, so it exercises the same code paths in seconds on a CPU.
+
+    Args:
+        output (str): Directory to write the pipeline to
+        seed (int): Seed for the random weights
+    """
+    torch.manual_seed(seed)
+    unet = UNet2DConditionModel(
+        block_out_channels=(32, 64),
+        layers_per_block=2,
+        sample_size=32,
+        in_channels=4,
+        out_channels=4,
+        down_block_types=("DownBlock2D", "CrossAttnDownBlock2D"),
+        up_block_types=("CrossAttnUpBlock2D", "UpBlock2D"),
+        cross_attention_dim=32,
+    )
+    controlnet = ControlNetModel.from_unet(
+        unet, conditioning_embedding_out_channels=(16, 32)
+    )
+    vae = AutoencoderKL(
+        block_out_channels=(32, 64),
+        in_channels=3,
+        out_channels=3,
+        down_block_types=("DownEncoderBlock2D", "DownEncoderBlock2D"),
+        up_block_types=("UpDecoderBlock2D", "UpDecoderBlock2D"),
+        latent_channels=4,
+    )
+    text_encoder = CLIPTextModel(
+        CLIPTextConfig(
+            hidden_size=32,
+            intermediate_size=37,
+            num_attention_heads=4,
+            num_hidden_layers=5,
+            vocab_size=1000,
+        )
+    )
+    scheduler = DDIMScheduler(
+        beta_start=0.00085,
+        beta_end=0.012,
+        beta_schedule="scaled_linear",
+        clip_sample=False,
+        set_alpha_to_one=False,
+    )
+
+    pipe = StableDiffusionControlNetPipeline(
+        vae=vae,
+        text_encoder=text_encoder,
+        tokenizer=build_tiny_tokenizer(),
+        unet=unet,
+        controlnet=controlnet,
+        scheduler=scheduler,
+        safety_checker=None,
+        feature_extractor=None,
+        requires_safety_checker=False,
+    )
+    pipe.save_pretrained(output)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sd-model", help="defaults to DEFAULT_SD_MODEL")
+    parser.add_argument(
+        "--controlnet-model", help="defaults to DEFAULT_CONTROLNET_MODEL"
+    )
+    parser.add_argument(
+        "--tiny", action="store_true", help="build a small random-weight pipeline"
+    )
+    parser.add_argument("--output", required=True)
+    args = parser.parse_args()
+
+    if args.tiny:
+        export_tiny(args.output)
+    else:
+        settings = get_settings()
+        export(
+            args.sd_model or settings.DEFAULT_SD_MODEL,
+            args.controlnet_model or settings.DEFAULT_CONTROLNET_MODEL,
+            args.output,
+        )
+    print(f"Pipeline saved to {args.output}")
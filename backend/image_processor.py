@@ -6,15 +6,19 @@ processing and color transfer operations.
 
 import numpy as np
 import logging
-from PIL import Image
+from PIL import Image, ImageDraw
+from typing import Iterable, List
 
 from color_transfer import ColorTransfer
 from controlnet_handler import ControlNetHandler
 from data_models.processing_request import ProcessingRequest
+from data_models.sweep_request import SweepRequest
 
 
 logger = logging.getLogger(__name__)
 
+LABEL_HEIGHT = 20
+
 
 class ImageProcessor:
     """Orchestrates the complete image processing workflow.
@@ -54,32 +58,128 @@ class ImageProcessor:
 
             input_resized = np.array(
                 input_image.resize(
-                    (
-                        processing_params.image_resolution,
-                        processing_params.image_resolution,
-                    )
-                )
-            )
-
-            generated_array = np.array(generated_image)
-
-            color_transferred = (
-                color_transfer.take_luminance_from_first_chroma_from_second(
-                    input_resized,
-                    generated_array,
-                    mode=processing_params.color_transfer_mode,
-                    s=processing_params.color_transfer_strength,
+                    controlnet_handler.get_output_size(input_image, processing_params)
                 )
             )
 
             return {
                 "control_image": control_image,
                 "generated_image": generated_image,
-                "color_transferred": Image.fromarray(
-                    color_transferred.astype(np.uint8)
+                "color_transferred": self._color_transfer(
+                    input_resized, generated_image, processing_params, color_transfer
                 ),
             }
 
         except Exception as e:
             logger.error(f"Error in image processing pipeline: {e}")
             raise
+
+    def process_sweep(
+        self,
+        input_image: Image.Image,
+        sweep_params: SweepRequest,
+        cells: List[ProcessingRequest],
+        controlnet_handler: ControlNetHandler,
+        color_transfer: ColorTransfer,
+    ):
+        """Process an input image for every cell of a parameter grid.
+
+        Args:
+            input_image (Image.Image): The source image to process
+            sweep_params (SweepRequest): Sweep configuration
+            cells (List[ProcessingRequest]): Expanded grid cells of the sweep
+            controlnet_handler (ControlNetHandler): Handler for ControlNet operations
+            color_transfer (ColorTransfer): Handler for color transfer operations
+
+        Yields:
+            dict: Dictionary per cell containing:
+                - params: Processing parameters of the cell
+                - control_image: Edge detection result
+                - generated_image: ControlNet generation result
+                - color_transferred: Final image with color transfer applied
+
+        Raises:
+            Exception: If processing fails at any stage
+        """
+        try:
+            input_resized = np.array(
+                input_image.resize(
+                    controlnet_handler.get_output_size(input_image, sweep_params)
+                )
+            )
+
+            generated = controlnet_handler.process_sweep(
+                input_image, cells, sweep_params.batch_size
+            )
+            for cell, control_image, generated_image in generated:
+                yield {
+                    "params": cell,
+                    "control_image": control_image,
+                    "generated_image": generated_image,
+                    "color_transferred": self._color_transfer(
+                        input_resized, generated_image, cell, color_transfer
+                    ),
+                }
+
+        except Exception as e:
+            logger.error(f"Error in sweep processing pipeline: {e}")
+            raise
+
+    def make_contact_sheet(
+        self, results: Iterable[dict], num_cells: int, columns: int
+    ) -> Image.Image:
+        """Arrange sweep results into a labelled grid image.
+
+        Each result is pasted onto the sheet as soon as it arrives, so only the
+        current cell's images are kept in memory.
+
+        Args:
+            results (Iterable[dict]): Per-cell results as yielded by process_sweep
+            num_cells (int): Total number of cells in the sweep
+            columns (int): Number of cells per row
+
+        Returns:
+            Image.Image: Contact sheet of the color-transferred images
+        """
+        sheet = None
+        for index, result in enumerate(results):
+            cell_image = result["color_transferred"]
+            cell_width, cell_height = cell_image.size
+            if sheet is None:
+                rows = -(-num_cells // columns)
+                sheet = Image.new(
+                    "RGB",
+                    (columns * cell_width, rows * (cell_height + LABEL_HEIGHT)),
+                    "white",
+                )
+                draw = ImageDraw.Draw(sheet)
+
+            params = result["params"]
+            left = (index % columns) * cell_width
+            top = (index // columns) * (cell_height + LABEL_HEIGHT)
+            draw.text(
+                (left + 4, top + 4),
+                f"seed={params.seed} cfg={params.guidance_scale:g} "
+                f"cn={params.controlnet_conditioning_scale:g}",
+                fill="black",
+            )
+            sheet.paste(cell_image, (left, top + LABEL_HEIGHT))
+
+        return sheet
+
+    def _color_transfer(
+        self,
+        input_resized: np.ndarray,
+        generated_image: Image.Image,
+        processing_params: ProcessingRequest,
+        color_transfer: ColorTransfer,
+    ) -> Image.Image:
+        color_transferred = (
+            color_transfer.take_luminance_from_first_chroma_from_second(
+                input_resized,
+                np.array(generated_image),
+                mode=processing_params.color_transfer_mode,
+                s=processing_params.color_transfer_strength,
+            )
+        )
+        return Image.fromarray(color_transferred.astype(np.uint8))
@@ -6,21 +6,25 @@ The API supports image processing with ControlNet and color transfer operations.
 """
 
 from fastapi import FastAPI, UploadFile, File, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from io import BytesIO
 from PIL import Image
 import base64
 import uvicorn
 import json
 import logging
+from typing import List
 
 # Internal imports
 from config.settings import get_settings
 from data_models.processing_request import ProcessingRequest
+from data_models.sweep_request import SweepRequest
 from pipeline_manager import PipelineManager
 from controlnet_handler import ControlNetHandler
 from color_transfer import ColorTransfer
 from image_processor import ImageProcessor
+from memory_governor import MemoryGovernor, MemoryBudgetExceeded
 
 # Initialize logging
 logging.basicConfig(level=logging.INFO)
@@ -35,6 +39,7 @@ pipeline_manager = PipelineManager()
 controlnet_handler = ControlNetHandler(pipeline_manager)
 color_transfer = ColorTransfer()
 image_processor = ImageProcessor()
+memory_governor = MemoryGovernor(pipeline_manager.device)
 
 
 def image_to_base64(image: Image.Image) -> str:
@@ -64,6 +69,62 @@ async def startup_event():
         logger.error(f"Failed to load pipeline: {e}")
 
 
+def process_with_memory_governor(
+    input_image: Image.Image, processing_params: ProcessingRequest
+):
+    """Process an image once the memory governor admits the request.
+
+    Args:
+        input_image (Image.Image): The input image
+        processing_params (ProcessingRequest): Requested processing parameters
+
+    Returns:
+        tuple: Processing results and admission metadata, including whether
+            the resolution was lowered under memory pressure
+
+    Raises:
+        MemoryBudgetExceeded: If the request does not fit the memory budget
+    """
+    with memory_governor.admit(processing_params) as admitted:
+        processed = image_processor.process(
+            input_image, admitted.params, controlnet_handler, color_transfer
+        )
+    return processed, admitted.metadata
+
+
+def sweep_with_memory_governor(
+    input_image: Image.Image,
+    sweep_params: SweepRequest,
+    cells: List[ProcessingRequest],
+):
+    """Process a sweep once the memory governor admits it.
+
+    The whole sweep holds a single reservation sized for one diffusion batch.
+    If the governor lowers the resolution, every cell uses the lower one.
+
+    Args:
+        input_image (Image.Image): The input image
+        sweep_params (SweepRequest): Requested sweep parameters
+        cells (List[ProcessingRequest]): Expanded grid cells of the sweep
+
+    Yields:
+        The AdmittedRequest first, then the per-cell results of process_sweep
+
+    Raises:
+        MemoryBudgetExceeded: If the sweep does not fit the memory budget
+    """
+    batch_size = min(sweep_params.batch_size, len(cells))
+    with memory_governor.admit(sweep_params, batch_size=batch_size) as admitted:
+        resolution = admitted.params.image_resolution
+        cells = [
+            cell.model_copy(update={"image_resolution": resolution}) for cell in cells
+        ]
+        yield admitted
+        yield from image_processor.process_sweep(
+            input_image, admitted.params, cells, controlnet_handler, color_transfer
+        )
+
+
 @app.post("/process")
 async def process_image(file: UploadFile = File(...), params: str = ""):
     """Process an uploaded image using ControlNet and color transfer.
@@ -78,9 +139,12 @@ async def process_image(file: UploadFile = File(...), params: str = ""):
             - control: Edge detection result
             - generated: ControlNet generation
             - color_transferred: Final processed image
+        and a metadata entry describing memory admission and any resolution
+        fallback
 
     Raises:
-        HTTPException: If processing fails
+        HTTPException: 503 if the request does not fit the memory budget,
+            500 if processing fails
     """
     try:
         if params:
@@ -94,8 +158,8 @@ async def process_image(file: UploadFile = File(...), params: str = ""):
         if input_image.mode != "RGB":
             input_image = input_image.convert("RGB")
 
-        processed = image_processor.process(
-            input_image, processing_params, controlnet_handler, color_transfer
+        processed, metadata = await run_in_threadpool(
+            process_with_memory_governor, input_image, processing_params
         )
 
         results = {
@@ -103,23 +167,145 @@ async def process_image(file: UploadFile = File(...), params: str = ""):
             "control": image_to_base64(processed["control_image"]),
             "generated": image_to_base64(processed["generated_image"]),
             "color_transferred": image_to_base64(processed["color_transferred"]),
+            "metadata": metadata,
         }
 
         return JSONResponse(content=results)
 
+    except MemoryBudgetExceeded as e:
+        logger.warning(f"Rejected request under memory pressure: {e}")
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logger.error(f"Error processing image: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/sweep")
+async def sweep_image(file: UploadFile = File(...), params: str = ""):
+    """Process an uploaded image for every cell of a parameter grid.
+
+    Preprocessing and prompt encoding are shared across the grid, and cells
+    with the same guidance and conditioning scales are generated in batches.
+
+    Args:
+        file (UploadFile): The input image file
+        params (str): JSON string containing sweep parameters
+
+    Returns:
+        StreamingResponse: Either a PNG contact sheet of the color-transferred
+            images, or newline-delimited JSON with one line per cell containing
+            its parameters and base64-encoded images, streamed as cells finish.
+            The X-Memory-Metadata header describes memory admission and any
+            resolution fallback.
+
+    Raises:
+        HTTPException: 400 if the grid is too large, 503 if it does not fit
+            the memory budget, 500 if processing fails
+    """
+    processed = None
+    try:
+        if params:
+            params_dict = json.loads(params)
+            sweep_params = SweepRequest(**params_dict)
+        else:
+            sweep_params = SweepRequest(prompt="high quality image")
+
+        num_cells = sweep_params.num_cells()
+        if num_cells > settings.MAX_SWEEP_CELLS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Sweep has {num_cells} cells, "
+                f"maximum is {settings.MAX_SWEEP_CELLS}",
+            )
+        if sweep_params.batch_size > settings.MAX_SWEEP_BATCH_SIZE:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Sweep batch size is {sweep_params.batch_size}, "
+                f"maximum is {settings.MAX_SWEEP_BATCH_SIZE}",
+            )
+        cells = sweep_params.cells()
+
+        contents = await file.read()
+        input_image = Image.open(BytesIO(contents))
+        if input_image.mode != "RGB":
+            input_image = input_image.convert("RGB")
+
+        processed = sweep_with_memory_governor(input_image, sweep_params, cells)
+        admitted = await run_in_threadpool(next, processed)
+        headers = {"X-Memory-Metadata": json.dumps(admitted.metadata)}
+
+        if sweep_params.output == "cells":
+            # Run up to the first cell before responding, so that setup errors
+            # are reported as HTTP errors rather than inside a 200 stream.
+            first = await run_in_threadpool(next, processed)
+
+            def encode_cell(result):
+                cell = {
+                    "seed": result["params"].seed,
+                    "guidance_scale": result["params"].guidance_scale,
+                    "controlnet_conditioning_scale": result[
+                        "params"
+                    ].controlnet_conditioning_scale,
+                    "control": image_to_base64(result["control_image"]),
+                    "generated": image_to_base64(result["generated_image"]),
+                    "color_transferred": image_to_base64(result["color_transferred"]),
+                }
+                return json.dumps(cell) + "\n"
+
+            async def stream_cells():
+                # Advance the sweep from an async generator so that a client
+                # disconnect reaches the finally block, which closes the sweep
+                # and releases its memory reservation right away.
+                try:
+                    result = first
+                    while result is not None:
+                        yield await run_in_threadpool(encode_cell, result)
+                        result = await run_in_threadpool(next, processed, None)
+                except Exception as e:
+                    logger.error(f"Error streaming sweep results: {e}")
+                    yield json.dumps({"error": str(e)}) + "\n"
+                finally:
+                    processed.close()
+
+            return StreamingResponse(
+                stream_cells(), media_type="application/x-ndjson", headers=headers
+            )
+
+        sheet = await run_in_threadpool(
+            image_processor.make_contact_sheet,
+            processed,
+            len(cells),
+            sweep_params.columns(),
+        )
+        buffered = BytesIO()
+        sheet.save(buffered, format="PNG")
+        buffered.seek(0)
+        return StreamingResponse(buffered, media_type="image/png", headers=headers)
+
+    except HTTPException:
+        raise
+    except MemoryBudgetExceeded as e:
+        logger.warning(f"Rejected sweep under memory pressure: {e}")
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        if processed is not None:
+            processed.close()
+        logger.error(f"Error processing sweep: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.get("/health")
 async def health_check():
     """Check the health status of the application.
 
     Returns:
-        dict: Health status and pipeline state
+        dict: Health status, pipeline state and memory usage
     """
-    return {"status": "healthy", "pipeline_loaded": pipeline_manager.is_loaded()}
+    return {
+        "status": "healthy",
+        "pipeline_loaded": pipeline_manager.is_loaded(),
+        "memory": memory_governor.snapshot(),
+    }
 
 
 if __name__ == "__main__":
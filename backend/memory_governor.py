@@ -0,0 +1,242 @@
+"""Memory-aware admission control for image processing requests.
+
+This module estimates the peak memory of a processing request from its
+resolution and batch size, tracks process RSS and device memory, and queues or
+rejects requests that would exceed the configured memory budget. Under
+sustained pressure it can optionally lower the requested resolution.
+"""
+
+import threading
+import time
+import logging
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+import psutil
+import torch
+
+from config.settings import get_settings
+from data_models.processing_request import ProcessingRequest
+
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+
+class MemoryBudgetExceeded(RuntimeError):
+    """Raised when a request cannot be admitted within the memory budget."""
+
+
+@dataclass
+class AdmittedRequest:
+    """A request admitted by the memory governor.
+
+    Attributes:
+        params (ProcessingRequest): Parameters to process with, possibly at a
+            lower resolution than requested
+        metadata (dict): Admission details to report in the response
+    """
+
+    params: ProcessingRequest
+    metadata: dict = field(default_factory=dict)
+
+
+class MemoryGovernor:
+    """Admits processing requests according to a memory budget.
+
+    Each admitted request reserves its estimated peak memory until it
+    finishes. A new request is admitted when the current memory usage plus
+    all reservations plus its own estimate fits in the budget; otherwise it
+    waits for running requests to finish, and is rejected after a timeout.
+
+    Running requests are counted once: committed memory is the larger of the
+    measured usage and the idle usage (last measured with nothing in flight)
+    plus all reservations. The first covers memory used outside the governor,
+    the second the part of each reservation a request has not allocated yet.
+
+    Args:
+        device (str): Device the pipeline runs on, e.g. 'cuda' or 'cpu'
+    """
+
+    def __init__(self, device: str):
+        self.settings = get_settings()
+        self.device = device
+        self.budget_mb = self.settings.MEMORY_BUDGET_MB or self._default_budget_mb()
+        self._reserved_mb = 0.0
+        self._idle_usage_mb = 0.0
+        self._in_flight = 0
+        self._condition = threading.Condition()
+
+    def _uses_cuda(self):
+        return self.device.startswith("cuda") and torch.cuda.is_available()
+
+    def _default_budget_mb(self):
+        if self._uses_cuda():
+            total = torch.cuda.get_device_properties(self.device).total_memory
+        else:
+            total = psutil.virtual_memory().total
+        return 0.9 * total / MB
+
+    def rss_mb(self) -> float:
+        """Return the resident set size of this process in MB."""
+        return psutil.Process().memory_info().rss / MB
+
+    def device_mb(self) -> float:
+        """Return the memory in use on the CUDA device in MB, 0 on CPU.
+
+        This is measured by the driver, so it includes memory used by other
+        processes on the device. Blocks cached but not allocated by the torch
+        allocator are excluded, as new requests reuse them.
+        """
+        if not self._uses_cuda():
+            return 0.0
+        free, total = torch.cuda.mem_get_info(self.device)
+        reserved = torch.cuda.memory_reserved(self.device)
+        allocated = torch.cuda.memory_allocated(self.device)
+        return (total - free - (reserved - allocated)) / MB
+
+    def usage_mb(self) -> float:
+        """Return the current memory usage counted against the budget."""
+        return self.device_mb() if self._uses_cuda() else self.rss_mb()
+
+    def estimate_peak_mb(self, params: ProcessingRequest, batch_size: int = 1):
+        """Estimate the additional peak memory of a request.
+
+        Activation memory grows with the number of pixels per diffusion run,
+        which is the tile size for tiled requests. Classifier-free guidance
+        doubles the effective batch. Tiled requests add a term for the
+        full-size buffers: the latent and control canvases and the decoded
+        output, which grow with the output area instead of the tile size.
+
+        Args:
+            params (ProcessingRequest): Processing parameters
+            batch_size (int): Number of images generated per diffusion run
+
+        Returns:
+            float: Estimated peak memory in MB
+        """
+        side = params.image_resolution
+        output_mb = 0.0
+        if params.tiled:
+            side = min(side, params.tile_size)
+            output_megapixels = params.image_resolution**2 / 1e6
+            output_mb = self.settings.MEMORY_MB_PER_OUTPUT_MEGAPIXEL * output_megapixels
+        megapixels = side * side / 1e6
+        guidance_factor = 2 if params.guidance_scale > 1 else 1
+        return (
+            self.settings.MEMORY_OVERHEAD_MB
+            + output_mb
+            + self.settings.MEMORY_MB_PER_MEGAPIXEL
+            * megapixels
+            * batch_size
+            * guidance_factor
+        )
+
+    def snapshot(self) -> dict:
+        """Return the current memory state for monitoring."""
+        with self._condition:
+            return {
+                "budget_mb": round(self.budget_mb, 1),
+                "reserved_mb": round(self._reserved_mb, 1),
+                "committed_mb": round(self._committed_mb(), 1),
+                "in_flight": self._in_flight,
+                "rss_mb": round(self.rss_mb(), 1),
+                "device_mb": round(self.device_mb(), 1),
+            }
+
+    def _committed_mb(self) -> float:
+        usage = self.usage_mb()
+        if self._in_flight == 0:
+            self._idle_usage_mb = usage
+            return usage
+        return max(usage, self._idle_usage_mb + self._reserved_mb)
+
+    def _fits(self, estimate_mb: float) -> bool:
+        return self._committed_mb() + estimate_mb <= self.budget_mb
+
+    def _degrade(self, params: ProcessingRequest):
+        if params.tiled:
+            return None
+        resolution = max(
+            self.settings.MEMORY_MIN_RESOLUTION,
+            int(params.image_resolution * 0.75) // 64 * 64,
+        )
+        if resolution >= params.image_resolution:
+            return None
+        return params.model_copy(update={"image_resolution": resolution})
+
+    @contextmanager
+    def admit(self, params: ProcessingRequest, batch_size: int = 1):
+        """Reserve memory for a request for the duration of the context.
+
+        Args:
+            params (ProcessingRequest): Requested processing parameters
+            batch_size (int): Number of images generated per diffusion run
+
+        Yields:
+            AdmittedRequest: Parameters to process with and admission metadata
+
+        Raises:
+            MemoryBudgetExceeded: If the request cannot be admitted in time
+        """
+        if not self.settings.MEMORY_GOVERNOR_ENABLED:
+            yield AdmittedRequest(params)
+            return
+
+        start = time.monotonic()
+        deadline = start + self.settings.MEMORY_QUEUE_TIMEOUT_S
+        degrade_at = start + self.settings.MEMORY_DEGRADE_AFTER_S
+        requested_resolution = params.image_resolution
+
+        with self._condition:
+            while True:
+                estimate = self.estimate_peak_mb(params, batch_size)
+                if self._fits(estimate):
+                    break
+
+                now = time.monotonic()
+                can_degrade = self.settings.MEMORY_DEGRADE_RESOLUTION and (
+                    now >= degrade_at or self._in_flight == 0
+                )
+                degraded = self._degrade(params) if can_degrade else None
+                if degraded is not None:
+                    logger.warning(
+                        f"Memory pressure: lowering resolution from "
+                        f"{params.image_resolution} to {degraded.image_resolution}"
+                    )
+                    params = degraded
+                    continue
+
+                if self._in_flight == 0 or now >= deadline:
+                    available = self.budget_mb - self._committed_mb()
+                    raise MemoryBudgetExceeded(
+                        f"Request needs ~{estimate:.0f} MB, {available:.0f} MB "
+                        f"of the {self.budget_mb:.0f} MB budget available"
+                    )
+
+                wake_at = deadline
+                if self.settings.MEMORY_DEGRADE_RESOLUTION and now < degrade_at:
+                    wake_at = min(wake_at, degrade_at)
+                self._condition.wait(timeout=wake_at - now)
+
+            self._reserved_mb += estimate
+            self._in_flight += 1
+
+        admitted = AdmittedRequest(
+            params,
+            {
+                "requested_resolution": requested_resolution,
+                "image_resolution": params.image_resolution,
+                "degraded": params.image_resolution != requested_resolution,
+                "queued_seconds": round(time.monotonic() - start, 3),
+                "estimated_peak_mb": round(estimate, 1),
+            },
+        )
+        try:
+            yield admitted
+        finally:
+            with self._condition:
+                self._reserved_mb -= estimate
+                self._in_flight -= 1
+                self._condition.notify_all()
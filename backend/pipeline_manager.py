@@ -7,8 +7,10 @@ pipeline with ControlNet integration, including model loading and device managem
 import torch
 from diffusers import StableDiffusionControlNetPipeline, ControlNetModel
 import logging
+import threading
 import warnings
 from config.settings import get_settings
+from cpu_profile import load_cpu_pipeline
 
 logger = logging.getLogger(__name__)
 
@@ -18,22 +20,29 @@ class PipelineManager:
 
     Handles initialization, loading of models, and provides access to the
     pipeline for image generation. Implements memory optimization techniques
-    like CPU offloading.
+    like CPU offloading. The pipeline keeps per-call state, so callers must hold
+    ``lock`` while running it.
     """
 
     def __init__(self):
         self.pipeline = None
         self.settings = get_settings()
+        self.lock = threading.Lock()
 
     def setup_pipeline(self):
         """Initialize and set up the Stable Diffusion pipeline with ControlNet.
 
         Loads the ControlNet and Stable Diffusion models, moves them to the
         appropriate device, and enables CPU offloading for memory optimization.
+        With the 'cpu' execution profile, a float32 pipeline with int8
+        quantised UNet and ControlNet is loaded instead.
 
         Raises:
             Exception: If there's an error during pipeline setup
         """
+        if self.settings.EXECUTION_PROFILE == "cpu":
+            return self.setup_cpu_pipeline()
+
         try:
             logger.info("Loading ControlNet model...")
             controlnet = ControlNetModel.from_pretrained(
@@ -60,6 +69,47 @@ class PipelineManager:
             logger.error(f"Error setting up pipeline: {e}")
             raise
 
+    def setup_cpu_pipeline(self):
+        """Initialize the pipeline for CPU-only inference.
+
+        Raises:
+            Exception: If there's an error during pipeline setup
+        """
+        try:
+            self.pipeline = load_cpu_pipeline(
+                model_dir=self.settings.CPU_MODEL_DIR,
+                sd_model=self.settings.DEFAULT_SD_MODEL,
+                controlnet_model=self.settings.DEFAULT_CONTROLNET_MODEL,
+                quantize=self.settings.CPU_QUANTIZE,
+                num_threads=self.settings.CPU_NUM_THREADS,
+            )
+            logger.info("CPU pipeline loaded successfully!")
+        except Exception as e:
+            logger.error(f"Error setting up CPU pipeline: {e}")
+            raise
+
+    @property
+    def device(self):
+        """Device the pipeline runs on."""
+        if self.settings.EXECUTION_PROFILE == "cpu":
+            return "cpu"
+        return self.settings.DEVICE
+
+    def get_inference_steps(self, requested_steps: int) -> int:
+        """Return the number of denoising steps to run for a request.
+
+        The CPU profile caps the step count, relying on its fast scheduler.
+
+        Args:
+            requested_steps (int): Steps requested by the client
+
+        Returns:
+            int: Steps to run
+        """
+        if self.settings.EXECUTION_PROFILE == "cpu":
+            return min(requested_steps, self.settings.CPU_MAX_INFERENCE_STEPS)
+        return requested_steps
+
     def get_pipeline(self):
         """Get the initialized pipeline instance.
 
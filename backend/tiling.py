@@ -0,0 +1,100 @@
+"""Tiling utilities for high-resolution image generation.
+
+This module provides helpers to split a large image into overlapping tiles,
+compute aspect-ratio preserving output sizes, and build the feathering weights
+used to blend overlapping tiles.
+"""
+
+import numpy as np
+from typing import List, Tuple
+
+
+def compute_output_size(
+    width: int, height: int, resolution: int, multiple: int = 8
+) -> Tuple[int, int]:
+    """Compute an output size whose longest side matches the target resolution.
+
+    Args:
+        width (int): Width of the source image
+        height (int): Height of the source image
+        resolution (int): Target length of the longest side in pixels
+        multiple (int): Both sides are rounded to a multiple of this value
+
+    Returns:
+        Tuple[int, int]: Output (width, height) preserving the aspect ratio
+    """
+    scale = resolution / max(width, height)
+    out_width = max(multiple, int(round(width * scale / multiple)) * multiple)
+    out_height = max(multiple, int(round(height * scale / multiple)) * multiple)
+    return out_width, out_height
+
+
+def tile_positions(length: int, tile_size: int, overlap: int) -> List[int]:
+    """Compute tile start offsets along one axis.
+
+    Tiles are spaced by ``tile_size - overlap`` and the last tile is aligned
+    with the end of the axis so the whole length is covered.
+
+    Args:
+        length (int): Length of the axis in pixels
+        tile_size (int): Tile length in pixels
+        overlap (int): Overlap between neighbouring tiles in pixels
+
+    Returns:
+        List[int]: Start offsets of the tiles
+    """
+    if length <= tile_size:
+        return [0]
+
+    stride = tile_size - overlap
+    positions = list(range(0, length - tile_size, stride))
+    positions.append(length - tile_size)
+    return positions
+
+
+def iter_tiles(
+    width: int, height: int, tile_size: int, overlap: int
+) -> List[Tuple[int, int, int, int]]:
+    """List the tile boxes covering an image.
+
+    Args:
+        width (int): Image width in pixels
+        height (int): Image height in pixels
+        tile_size (int): Tile side length in pixels
+        overlap (int): Overlap between neighbouring tiles in pixels
+
+    Returns:
+        List[Tuple[int, int, int, int]]: Tile boxes as (left, top, right, bottom)
+    """
+    tile_width = min(tile_size, width)
+    tile_height = min(tile_size, height)
+    return [
+        (left, top, left + tile_width, top + tile_height)
+        for top in tile_positions(height, tile_size, overlap)
+        for left in tile_positions(width, tile_size, overlap)
+    ]
+
+
+def blend_weights(width: int, height: int, overlap: int) -> np.ndarray:
+    """Build a feathering mask for blending a tile into the canvas.
+
+    Weights ramp up linearly across the overlap region on every edge and are
+    strictly positive, so values covered by a single tile are unchanged
+    after normalisation.
+
+    Args:
+        width (int): Tile width
+        height (int): Tile height
+        overlap (int): Overlap between neighbouring tiles
+
+    Returns:
+        np.ndarray: Weight mask of shape (height, width, 1)
+    """
+
+    def ramp(length):
+        if overlap <= 0:
+            return np.ones(length, dtype=np.float32)
+        distance = np.minimum(np.arange(length), np.arange(length)[::-1]) + 1
+        return np.clip(distance / (overlap + 1), 0, 1).astype(np.float32)
+
+    return np.outer(ramp(height), ramp(width))[:, :, np.newaxis]